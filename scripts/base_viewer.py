@@ -8,23 +8,28 @@ from __future__ import print_function
 
 import sys
 import os
+import time
 
 # Add parent directory to path to import utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from simpleai.search.viewers import BaseViewer
 from utils.animated_viewer import AnimatedSearchViewer
+from utils.distance_transform import reachability
+from utils.route_cache import RouteCache
 from common import GameWalkPuzzle, resultado_experimento, get_map, run_case
 
 # SETTINGS
 RANDOM_MAP = False
+USE_CACHE = True
+CACHE_PATH = ".route_cache.sqlite"
 
 
 # -----------------------------------------------------------------------------------
 # METRICS EXTRACTION (unique to this script)
 # -----------------------------------------------------------------------------------
 
-def extract_metrics(problem, result, viewer, algorithm_name):
+def extract_metrics(problem, result, viewer, algorithm_name, elapsed):
     # Length
     length = len(result.path())
 
@@ -37,16 +42,22 @@ def extract_metrics(problem, result, viewer, algorithm_name):
             prev = state
 
     # Stats
-    expanded = viewer.stats.get("expanded_nodes", "N/A")
-    max_list = viewer.stats.get("max_frontier_size", "N/A")
+    expanded = viewer.stats.get("visited_nodes", "N/A")
+    max_list = viewer.stats.get("max_fringe_size", "N/A")
+    # A cached result carries the time of the search that produced it, not the lookup
+    elapsed = viewer.stats.get("search_seconds", elapsed)
+    throughput = f"{expanded / elapsed:.0f}" if expanded != "N/A" and elapsed > 0 else "N/A"
 
     # Optimality
     if algorithm_name == "breadth_first":
-        optimal = "Sí" if len(set(problem.costs.values())) == 1 else "No"
-    elif algorithm_name == "uniform_cost":
+        uniform = len(set(problem.costs.values())) == 1 and problem.min_weight == problem.max_weight
+        optimal = "Sí" if uniform else "No"
+    elif algorithm_name in ("uniform_cost", "grid_uniform_cost"):
         optimal = "Sí"
-    elif algorithm_name == "astar":
-        optimal = "Sí" if problem.heuristic_number in (1, 2) else "No"
+    elif algorithm_name == "astar" or algorithm_name.startswith("grid_astar"):
+        # Manhattan (1) overestimates once diagonal moves are allowed
+        admissible = (2, 4, 5) if problem.diagonal else (1, 2, 4, 5)
+        optimal = "Sí" if problem.heuristic_number in admissible else "No"
     else:
         optimal = "No"
 
@@ -56,6 +67,7 @@ def extract_metrics(problem, result, viewer, algorithm_name):
         "Coste": cost_total,
         "Expandidos": expanded,
         "ListaMáx": max_list,
+        "Nodos/s": throughput,
         "Óptimo": optimal
     }
 
@@ -76,22 +88,27 @@ def main(MAP_ASCII, COSTS, algorithms, heuristic_number=1, use_animation=False):
                  if use_animation else BaseViewer()
 
         print(f"\nExperimento con algoritmo {algorithm.__name__}:")
+        start = time.perf_counter()
         result = algorithm(problem, graph_search=True, viewer=viewer)
+        elapsed = time.perf_counter() - start
 
         resultado_experimento(problem, MAP, result, viewer)
 
-        all_metrics.append(extract_metrics(problem, result, viewer, algorithm.__name__))
+        all_metrics.append(extract_metrics(problem, result, viewer, algorithm.__name__, elapsed))
 
         if use_animation:
             viewer.close()
 
     # --- METRICS TABLE ---
     print("\nTabla de métricas:")
-    print("Algoritmo | Long | Coste | Expandidos | ListaMáx | Óptimo")
-    print("----------------------------------------------------------")
+    print("Algoritmo | Long | Coste | Expandidos | ListaMáx | Nodos/s | Óptimo")
+    print("--------------------------------------------------------------------")
     for m in all_metrics:
         print(f"{m['Algoritmo']:9} | {m['Longitud']:4} | {m['Coste']:5} | "
-              f"{m['Expandidos']:9} | {m['ListaMáx']:8} | {m['Óptimo']}")
+              f"{m['Expandidos']:10} | {m['ListaMáx']:8} | {m['Nodos/s']:>7} | {m['Óptimo']}")
+
+    reachable, free = reachability(problem)
+    print(f"\nCeldas alcanzables desde T: {reachable}/{free} ({reachable / free:.0%})")
 
 
 # -----------------------------------------------------------------------------------
@@ -100,4 +117,5 @@ def main(MAP_ASCII, COSTS, algorithms, heuristic_number=1, use_animation=False):
 
 if __name__ == "__main__":
     MAP_ASCII = get_map(use_random=RANDOM_MAP)
-    run_case(3, MAP_ASCII, main)
+    cache = RouteCache(CACHE_PATH) if USE_CACHE else None
+    run_case(3, MAP_ASCII, main, cache=cache)
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""Benchmark: vectorized distance transform vs pure-Python BFS"""
+
+#!/usr/bin/env python
+# coding: utf-8
+
+from __future__ import print_function
+
+import random
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.distance_transform import dial, passable_mask, wavefront
+from utils.random_map import bfs_path_exists, generate_random_map
+
+# SETTINGS
+SIZES = (25, 50, 100, 200, 400)
+WALL_PROB = 0.2
+REPEATS = 3
+SEED = 0
+
+CASE2_COSTS = {"left": 3, "right": 1, "up": 1, "down": 3}
+
+
+def best_time(function):
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    random.seed(SEED)
+
+    print("Tamaño  | BFS Python (s) | Wavefront (s) | Dial caso 2 (s) | Aceleración")
+    print("-------------------------------------------------------------------------")
+    for size in SIZES:
+        grid = [list(row) for row in generate_random_map(size, size, WALL_PROB).split("\n")]
+        start = next((x, y) for y, row in enumerate(grid) for x, c in enumerate(row) if c == "T")
+        passable = passable_mask(grid)
+
+        # An unreachable goal makes the BFS flood the whole component, like the transform
+        bfs = best_time(lambda: bfs_path_exists(grid, start, (-1, -1)))
+        front = best_time(lambda: wavefront(passable, [start]))
+        costs = best_time(lambda: dial(passable, [start], CASE2_COSTS))
+
+        print(f"{size:3}x{size:<3} | {bfs:14.4f} | {front:13.4f} | {costs:15.4f} | {bfs / front:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""Benchmark: multi-vehicle planners, throughput vs fleet size on random maps"""
+
+#!/usr/bin/env python
+# coding: utf-8
+
+from __future__ import print_function
+
+import random
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.distance_transform import distance_field
+from utils.multi_agent import FleetPlanner, find_conflict
+from common import GameWalkPuzzle, get_map
+
+# SETTINGS
+MAPS = 5
+SEED = 0
+WIDTH, HEIGHT = 30, 20
+WALL_PROB = 0.2
+FLEETS = (1, 2, 4, 8, 16, 32)
+WINDOW = 16
+CBS_MAX_FLEET = 8
+CBS_MAX_NODES = 500
+
+COSTS = {"left": 1, "right": 1, "up": 1, "down": 1}
+
+
+def random_agents(problem, count, rng):
+    """count vehicles with distinct starts and distinct goals, all reachable from T"""
+    distance, _ = distance_field(problem)
+    cells = [(x, y) for y in range(problem.height) for x in range(problem.width) if distance[y][x] >= 0]
+    chosen = rng.sample(cells, 2 * count)
+    return list(zip(chosen[:count], chosen[count:]))
+
+
+def evaluate(planner, agents, paths):
+    """(solved, sum of costs, makespan) of the paths returned by a planner"""
+    goals = [planner.index(goal) for _, goal in agents]
+    if paths is None or None in paths or find_conflict(paths) is not None:
+        return False, 0, 0
+    if any(path[-1] != goal for path, goal in zip(paths, goals)):
+        return False, 0, 0
+
+    cost = 0
+    for path in paths:
+        for cell, nxt in zip(path, path[1:]):
+            cost += dict(planner.moves[cell])[nxt]
+    return True, cost, max(len(path) - 1 for path in paths)
+
+
+def main():
+    rng = random.Random(SEED)
+    planners = {
+        "prioritized": lambda planner, agents: planner.plan_prioritized(agents),
+        f"windowed w={WINDOW}": lambda planner, agents: planner.plan_windowed(agents, window=WINDOW),
+        "cbs": lambda planner, agents: planner.plan_cbs(agents, max_nodes=CBS_MAX_NODES),
+    }
+
+    results = {}
+    for map_index in range(MAPS):
+        random.seed(SEED + map_index)
+        MAP = [list(row) for row in get_map(True, WIDTH, HEIGHT, WALL_PROB).split("\n") if row]
+        planner = FleetPlanner(GameWalkPuzzle(MAP, COSTS, 1))
+
+        for fleet in FLEETS:
+            agents = random_agents(planner.problem, fleet, rng)
+            for name, plan in planners.items():
+                if name == "cbs" and fleet > CBS_MAX_FLEET:
+                    continue
+                start = time.perf_counter()
+                paths = plan(planner, agents)
+                elapsed = time.perf_counter() - start
+
+                solved, cost, makespan = evaluate(planner, agents, paths)
+                row = results.setdefault((fleet, name), [0, 0, 0, 0.0])
+                row[0] += solved
+                row[1] += cost
+                row[2] += makespan
+                row[3] += elapsed
+
+    print(f"{MAPS} mapas {WIDTH}x{HEIGHT}, muros {WALL_PROB:.0%}")
+    print("Flota | Planificador   | Resueltos | Coste total medio | Makespan medio | "
+          "Tiempo ms medio | Vehículos/s")
+    print("-" * 100)
+    for (fleet, name), (solved, cost, makespan, seconds) in sorted(results.items()):
+        mean_cost = f"{cost / solved:17.1f}" if solved else f"{'-':>17}"
+        mean_span = f"{makespan / solved:14.1f}" if solved else f"{'-':>14}"
+        print(f"{fleet:5} | {name:14} | {solved:4}/{MAPS:<4} | {mean_cost} | {mean_span} | "
+              f"{1000 * seconds / MAPS:15.1f} | {fleet * MAPS / seconds:11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,9 +5,13 @@ from __future__ import print_function
 
 import sys
 import os
+from array import array
+from math import hypot
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from simpleai.search import SearchProblem, astar, breadth_first, depth_first, uniform_cost
+from utils.grid_search import ANY_ANGLE, FRONTIERS, grid_astar, make_grid_astar, segment_cost, theta_star
+from utils.landmarks import tables_for
 from utils.random_map import generate_random_map
 
 
@@ -17,11 +21,17 @@ from utils.random_map import generate_random_map
 
 class GameWalkPuzzle(SearchProblem):
 
-    def __init__(self, board, costs, heuristic_number):
+    def __init__(self, board, costs, heuristic_number, weights=None, landmarks=None):
         self.board = board
         self.costs = costs
         self.heuristic_number = heuristic_number
         self.goal = (0, 0)
+        self.width = len(board[0])
+        self.height = len(board)
+
+        # Traversal weight of every cell (row-major). Digits on the map set the
+        # weight of that cell; an explicit `weights` grid overrides the map.
+        self.weights = array("H", bytes(2 * self.width * self.height))
 
         for y in range(len(board)):
             for x in range(len(board[y])):
@@ -30,13 +40,49 @@ class GameWalkPuzzle(SearchProblem):
                 elif board[y][x].lower() == "p":
                     self.goal = (x, y)
 
+                if board[y][x] != "#":
+                    if weights is not None:
+                        weight = weights[y][x]
+                    elif board[y][x].isdigit():
+                        weight = int(board[y][x])
+                    else:
+                        weight = 1
+                    # Weights are stored as unsigned 16-bit integers
+                    if weight != int(weight) or not 1 <= weight <= 0xFFFF:
+                        raise ValueError(f"Peso inválido en {(x, y)}: {weight}")
+                    self.weights[y * self.width + x] = int(weight)
+
+        passable = [w for w in self.weights if w]
+        self.min_weight = min(passable)
+        self.max_weight = max(passable)
+
+        # Cheapest straight and diagonal step, used by the octile heuristic
+        straight = [c for a, c in costs.items() if not self.is_diagonal(a)]
+        diagonal = [c for a, c in costs.items() if self.is_diagonal(a)]
+        self.diagonal = bool(diagonal)
+        self.straight_cost = min(straight)
+        self.diagonal_cost = min(diagonal + [2 * self.straight_cost])
+
         super().__init__(initial_state=self.initial)
 
+        # Landmark distance tables for the ALT heuristic (built once per map)
+        self.landmarks = landmarks
+        if heuristic_number == 5 and landmarks is None:
+            self.landmarks = tables_for(self)
+
+    @staticmethod
+    def is_diagonal(action):
+        return ("up" in action or "down" in action) and ("left" in action or "right" in action)
+
     def actions(self, state):
+        x, y = state
         actions = []
         for action in self.costs.keys():
             nx, ny = self.result(state, action)
             if self.board[ny][nx] != "#":
+                # Diagonal moves must not cut the corner of a wall
+                if nx != x and ny != y and (self.board[y][nx] == "#" or self.board[ny][x] == "#"):
+                    continue
                 actions.append(action)
         return actions
 
@@ -52,22 +98,39 @@ class GameWalkPuzzle(SearchProblem):
         return state == self.goal
 
     def cost(self, state, action, state2):
-        return self.costs[action]
+        if action == ANY_ANGLE:
+            return segment_cost(self, state, state2)
+        # Directional cost scaled by the weight of the cell being entered
+        return self.costs[action] * self.weights[state2[1] * self.width + state2[0]]
 
-    # Heuristics
+    # Heuristics (scaled by the cheapest cell so they never overestimate more
+    # than their unweighted version)
     def heuristic1(self, s):
-        return abs(s[0] - self.goal[0]) + abs(s[1] - self.goal[1])
+        return self.min_weight * (abs(s[0] - self.goal[0]) + abs(s[1] - self.goal[1]))
 
     def heuristic2(self, s):
-        return max(abs(s[0] - self.goal[0]), abs(s[1] - self.goal[1]))
+        return self.min_weight * max(abs(s[0] - self.goal[0]), abs(s[1] - self.goal[1]))
 
     def heuristic3(self, s):
-        return 2 * (abs(s[0] - self.goal[0]) + abs(s[1] - self.goal[1]))
+        return self.min_weight * 2 * (abs(s[0] - self.goal[0]) + abs(s[1] - self.goal[1]))
+
+    def heuristic4(self, s):
+        # Octile distance: diagonal steps for the shorter axis, straight for the rest
+        dx, dy = abs(s[0] - self.goal[0]), abs(s[1] - self.goal[1])
+        return self.min_weight * (self.diagonal_cost * min(dx, dy)
+                                  + min(self.straight_cost, self.diagonal_cost) * abs(dx - dy))
+
+    def heuristic5(self, s):
+        # ALT: triangle-inequality bounds from precomputed landmark distances
+        return self.landmarks.heuristic(s[1] * self.width + s[0],
+                                        self.goal[1] * self.width + self.goal[0])
 
     def heuristic(self, state):
         if self.heuristic_number == 1: return self.heuristic1(state)
         if self.heuristic_number == 2: return self.heuristic2(state)
         if self.heuristic_number == 3: return self.heuristic3(state)
+        if self.heuristic_number == 4: return self.heuristic4(state)
+        if self.heuristic_number == 5: return self.heuristic5(state)
         raise Exception("Heurística inválida")
 
 
@@ -127,26 +190,24 @@ DEFAULT_MAP_ASCII = """
 """
 
 
-def get_map(use_random=True, width=10, height=10, wall_prob=0.45):
+def get_map(use_random=True, width=10, height=10, wall_prob=0.45, weight_prob=0.0, max_weight=3):
     """Generate or return default map"""
-    return generate_random_map(width=width, height=height, wall_prob=wall_prob) if use_random else DEFAULT_MAP_ASCII
+    return generate_random_map(width=width, height=height, wall_prob=wall_prob,
+                               weight_prob=weight_prob, max_weight=max_weight) if use_random else DEFAULT_MAP_ASCII
 
 
 # -------------------------------------------------------------------------
 # CASE RUNNER
 # -------------------------------------------------------------------------
 
-def run_case(case_number, MAP_ASCII, main_function):
+def case_runs(case_number):
     """
-    Run a specific test case
+    Runs of a test case, as (COSTS, algorithms, heuristic_number) tuples
 
     Args:
-        case_number: 1, 2, or 3
-        MAP_ASCII: The map string to use
-        main_function: The main function to call (viewer-specific)
+        case_number: 1, 2, 3, 4 or 5
     """
     if case_number == 1:
-        print("\n================ CASE 1 ================\n")
         COSTS = {
                     "left":1, 
                     "right":1, 
@@ -154,21 +215,56 @@ def run_case(case_number, MAP_ASCII, main_function):
                     "down":1,
                  }
         algorithms = (breadth_first, depth_first)
-        main_function(MAP_ASCII, COSTS, algorithms)
+        return [(COSTS, algorithms, 1)]
 
     elif case_number == 2:
-        print("\n================ CASE 2 ================\n")
         COSTS = {"left":3, "right":1, "up":1, "down":3}
         algorithms = (breadth_first, uniform_cost, astar)
-        main_function(MAP_ASCII, COSTS, algorithms)
+        return [(COSTS, algorithms, 1)]
 
     elif case_number == 3:
-        print("\n================ CASE 3 ================\n")
         COSTS = {"left":3, "right":1, "up":1, "down":3}
         algorithms = (astar,)
-        for h in (1,2,3):
-            print(f"\n---- A* con Heurística {h} ----\n")
-            main_function(MAP_ASCII, COSTS, algorithms, heuristic_number=h)
+        return [(COSTS, algorithms, h) for h in (1,2,3,5)]
+
+    elif case_number == 4:
+        # Diagonals cost the Euclidean combination of their two components
+        COSTS = {"left":3, "right":1, "up":1, "down":3}
+        for vertical in ("up", "down"):
+            for horizontal in ("left", "right"):
+                COSTS[f"{vertical}-{horizontal}"] = hypot(COSTS[horizontal], COSTS[vertical])
+        algorithms = (uniform_cost, astar, theta_star)
+        return [(COSTS, algorithms, 4)]
+
+    elif case_number == 5:
+        # Grid engine with every frontier type (and the automatic choice)
+        COSTS = {"left":3, "right":1, "up":1, "down":3}
+        algorithms = (astar, grid_astar) + tuple(make_grid_astar(f) for f in FRONTIERS)
+        return [(COSTS, algorithms, 1)]
 
     else:
-        raise ValueError("case_number debe ser 1, 2 o 3.")
+        raise ValueError("case_number debe ser 1, 2, 3, 4 o 5.")
+
+
+def run_case(case_number, MAP_ASCII, main_function, cache=None):
+    """
+    Run a specific test case
+
+    Args:
+        case_number: 1, 2, 3, 4 or 5
+        MAP_ASCII: The map string to use
+        main_function: The main function to call (viewer-specific)
+        cache: Optional RouteCache; every algorithm is then served through it
+    """
+    runs = case_runs(case_number)
+    print(f"\n================ CASE {case_number} ================\n")
+
+    for COSTS, algorithms, heuristic_number in runs:
+        if len(runs) > 1:
+            print(f"\n---- A* con Heurística {heuristic_number} ----\n")
+        if cache is not None:
+            algorithms = tuple(cache.cached(algorithm) for algorithm in algorithms)
+        main_function(MAP_ASCII, COSTS, algorithms, heuristic_number=heuristic_number)
+
+    if cache is not None:
+        print(cache.report())
@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""Multi-map sweep: every case of run_case on many seeded random maps, in parallel"""
+
+#!/usr/bin/env python
+# coding: utf-8
+
+from __future__ import print_function
+
+import csv
+import multiprocessing
+import os
+import random
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from simpleai.search.viewers import BaseViewer
+from utils.grid_search import grid_uniform_cost
+from utils.landmarks import clear_tables
+from common import GameWalkPuzzle, case_runs, get_map
+
+# SETTINGS
+MAPS = 100
+SEED = 0
+WIDTH, HEIGHT = 20, 15
+WALL_PROB = 0.25
+WEIGHT_PROB = 0.0
+CASES = (1, 2, 3, 4, 5)
+OUTPUT = "sweep_results.csv"
+WORKERS = os.cpu_count()
+
+FIELDS = ["mapa", "semilla", "caso", "algoritmo", "heuristica",
+          "longitud", "coste", "coste_optimo", "ratio_coste", "expandidos", "lista_max", "segundos"]
+
+
+# -------------------------------------------------------------------------
+# ONE TASK = ONE CASE ON ONE MAP (runs in a worker process)
+# -------------------------------------------------------------------------
+
+def run_task(task):
+    map_index, case_number = task
+    seed = SEED + map_index
+    random.seed(seed)
+    MAP = [list(row) for row in get_map(True, WIDTH, HEIGHT, WALL_PROB, WEIGHT_PROB).split("\n") if row]
+
+    rows = []
+    for COSTS, algorithms, heuristic_number in case_runs(case_number):
+        optimal = grid_uniform_cost(GameWalkPuzzle(MAP, COSTS, 1)).cost
+
+        for algorithm in algorithms:
+            problem = GameWalkPuzzle(MAP, COSTS, heuristic_number)
+            viewer = BaseViewer()
+
+            start = time.perf_counter()
+            result = algorithm(problem, graph_search=True, viewer=viewer)
+            elapsed = time.perf_counter() - start
+
+            cost = 0
+            prev = problem.initial_state
+            for action, state in result.path():
+                if action:
+                    cost += problem.cost(prev, action, state)
+                    prev = state
+
+            rows.append({
+                "mapa": map_index,
+                "semilla": seed,
+                "caso": case_number,
+                "algoritmo": algorithm.__name__,
+                "heuristica": heuristic_number,
+                "longitud": len(result.path()),
+                "coste": round(cost, 6),
+                "coste_optimo": round(optimal, 6),
+                "ratio_coste": round(cost / optimal, 6) if optimal else 1.0,
+                "expandidos": viewer.stats["visited_nodes"],
+                "lista_max": viewer.stats["max_fringe_size"],
+                "segundos": round(elapsed, 6),
+            })
+
+    # Every task is a different map, so its landmark tables are never used again
+    clear_tables()
+    return rows
+
+
+def expected_rows(case_number):
+    return sum(len(algorithms) for _, algorithms, _ in case_runs(case_number))
+
+
+# -------------------------------------------------------------------------
+# RESUME
+# -------------------------------------------------------------------------
+
+def valid_row(row):
+    """Whether a CSV row has every column and numbers where numbers are expected"""
+    if None in row or None in row.values():
+        return False
+    try:
+        for field in FIELDS:
+            if field != "algoritmo":
+                float(row[field])
+    except ValueError:
+        return False
+    return True
+
+
+def drop_partial_line(path):
+    """Cut the file after its last newline, removing a line an interruption left half written"""
+    with open(path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        keep = end
+        while keep > 0:
+            start = max(0, keep - 4096)
+            f.seek(start)
+            newline = f.read(keep - start).rfind(b"\n")
+            if newline >= 0:
+                keep = start + newline + 1
+                break
+            keep = start
+        if keep < end:
+            f.truncate(keep)
+
+
+def completed_tasks(path):
+    """
+    Tasks already fully written to path. Rows of tasks cut off by an interruption
+    are dropped from the file so they are run again.
+    """
+    if not os.path.exists(path):
+        return set()
+    drop_partial_line(path)
+
+    counts = {}
+    invalid = False
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            if not valid_row(row):
+                invalid = True
+                continue
+            task = (int(row["mapa"]), int(row["caso"]))
+            counts[task] = counts.get(task, 0) + 1
+    done = {task for task, n in counts.items() if n == expected_rows(task[1])}
+
+    if invalid or len(done) < len(counts):
+        tmp = path + ".tmp"
+        with open(path, newline="") as src, open(tmp, "w", newline="") as dst:
+            writer = csv.DictWriter(dst, fieldnames=FIELDS)
+            writer.writeheader()
+            for row in csv.DictReader(src):
+                if valid_row(row) and (int(row["mapa"]), int(row["caso"])) in done:
+                    writer.writerow(row)
+        os.replace(tmp, path)
+    return done
+
+
+# -------------------------------------------------------------------------
+# AGGREGATED STATISTICS
+# -------------------------------------------------------------------------
+
+class Aggregate(object):
+    """
+    Running count, mean and maximum of a column and, with `percentiles`, a histogram
+    of its values: memory grows with the distinct values (rounded to `digits`
+    significant digits), not with the number of rows.
+    """
+
+    def __init__(self, percentiles=True, digits=None):
+        self.percentiles = percentiles
+        self.digits = digits
+        self.count = 0
+        self.total = 0.0
+        self.max = float("-inf")
+        self.histogram = {}
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        if not self.percentiles:
+            return
+        key = float(f"{value:.{self.digits}g}") if self.digits else value
+        self.histogram[key] = self.histogram.get(key, 0) + 1
+
+    def mean(self):
+        return self.total / self.count
+
+    def percentile(self, q):
+        """Smallest value with at least q% of the rows at or below it"""
+        rank = q / 100 * self.count
+        seen = 0
+        for value in sorted(self.histogram):
+            seen += self.histogram[value]
+            if seen >= rank:
+                return value
+        return self.max
+
+
+def summarize(path):
+    groups = {}
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            key = (int(row["caso"]), row["algoritmo"], int(row["heuristica"]))
+            if key not in groups:
+                groups[key] = (Aggregate(), Aggregate(percentiles=False), Aggregate(digits=3), [0])
+            expanded, ratio, ms, optimal = groups[key]
+            expanded.add(int(row["expandidos"]))
+            ratio.add(float(row["ratio_coste"]))
+            ms.add(1000 * float(row["segundos"]))
+            optimal[0] += float(row["ratio_coste"]) <= 1 + 1e-6
+
+    print("\nEstadísticas agregadas:")
+    print("Caso | Algoritmo          | H | Mapas | Expandidos media/p50/p90/p99 | "
+          "Ratio coste media/máx | Óptimo | Tiempo ms media/p90")
+    print("-" * 128)
+    for (case_number, name, h), (expanded, ratio, ms, optimal) in sorted(groups.items()):
+        p50, p90, p99 = (expanded.percentile(q) for q in (50, 90, 99))
+        print(f"{case_number:4} | {name:18} | {h} | {expanded.count:5} | "
+              f"{expanded.mean():8.1f} {p50:6.0f} {p90:6.0f} {p99:6.0f} | "
+              f"{ratio.mean():10.3f} {ratio.max:10.3f} | {optimal[0] / expanded.count:6.0%} | "
+              f"{ms.mean():8.2f} {ms.percentile(90):8.2f}")
+
+
+# -------------------------------------------------------------------------
+# MAIN
+# -------------------------------------------------------------------------
+
+def main():
+    done = completed_tasks(OUTPUT)
+    pending = [(m, c) for m in range(MAPS) for c in CASES if (m, c) not in done]
+    print(f"Tareas: {len(pending)} pendientes, {len(done)} ya completadas ({OUTPUT})")
+
+    new_file = not os.path.exists(OUTPUT) or os.path.getsize(OUTPUT) == 0
+    with open(OUTPUT, "a", newline="") as f, multiprocessing.Pool(WORKERS) as pool:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        if new_file:
+            writer.writeheader()
+        # Rows are written as each task finishes, so memory does not grow with MAPS
+        for finished, rows in enumerate(pool.imap_unordered(run_task, pending), start=1):
+            writer.writerows(rows)
+            f.flush()
+            if finished % 50 == 0 or finished == len(pending):
+                print(f"  {finished}/{len(pending)} tareas")
+
+    summarize(OUTPUT)
+
+
+if __name__ == "__main__":
+    main()
@@ -49,6 +49,7 @@ COLORS = {
     "visited": (180, 220, 255),  # Visited cells
     "current": (255, 255, 100),  # Current position
     "path": (100, 255, 150),     # Final path
+    "terrain": (215, 190, 140),  # Weighted cells (digits), darker when heavier
 }
 
 SPRITES = {
@@ -56,6 +57,13 @@ SPRITES = {
     "P": "utils/assets/treasure.png",
 }
 
+def terrain_color(weight):
+    """Shade of the terrain color for a cell weight (1 = empty, 9 = darkest)"""
+    r, g, b = COLORS["terrain"]
+    shade = min(weight, 9) * 10
+    return (r - shade, g - shade, b - shade)
+
+
 class AnimatedSearchViewer(BaseViewer):
     """Pygame viewer that shows the robot moving through the map during search"""
 
@@ -273,6 +281,8 @@ class AnimatedSearchViewer(BaseViewer):
                     color = COLORS["current"]
                 elif (x, y) in self.visited and (x, y) != self.initial_pos and (x, y) != self.goal_pos:
                     color = COLORS["visited"]
+                elif cell.isdigit():
+                    color = terrain_color(int(cell))
                 else:
                     color = COLORS.get(cell, (240, 240, 240))
 
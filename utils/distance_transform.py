@@ -0,0 +1,213 @@
+"""
+Vectorized Grid Distance Transform
+
+Computes the distance (and parent move) of EVERY cell of the grid from one or many
+sources with NumPy array operations, one whole frontier at a time instead of one cell
+at a time like a Python BFS over dicts and sets.
+
+## Layout
+
+The grid is flattened row-major with a one-cell wall border, so moving by (dx, dy) is
+adding a constant offset to every index and no bounds checks are needed. For each move
+a boolean mask, built by shifting the free-cell mask, says from which cells it is
+allowed (target free and, for diagonals, no corner-cutting, same rules as
+`GameWalkPuzzle.actions`).
+
+## Engines
+
+- **wavefront()**: unit costs. Each level moves the whole frontier (an index array) by
+  every move offset at once and keeps the unvisited cells it lands on, so the total
+  work is proportional to the number of cells, not levels × cells
+- **dial()**: small integer costs (`COSTS` × cell weight). Dial's bucket queue where
+  each bucket (all cells at distance d) is relaxed as one array operation per move;
+  stale entries are dropped by comparing with the current distance (lazy deletion)
+
+Both return `(distance, parent)` arrays shaped like the grid: distance is -1 for
+unreachable cells and parent is the index of the move used to reach the cell (-1 for
+sources). With `reverse=True` distances are measured TO the sources instead, and the
+parent is the move to take FROM the cell towards them.
+"""
+
+import numpy as np
+
+UNREACHABLE = -1
+
+FOUR_CONNECTED = {"left": 1, "right": 1, "up": 1, "down": 1}
+
+
+def passable_mask(board):
+    """Boolean (height, width) array of the non-wall cells of a list-of-rows map"""
+    return np.array([[cell != "#" for cell in row] for row in board], dtype=bool)
+
+
+def move_offset(action):
+    """(dx, dy) of an action name, composed the same way as GameWalkPuzzle.result"""
+    dx = ("right" in action) - ("left" in action)
+    dy = ("down" in action) - ("up" in action)
+    return dx, dy
+
+
+class _Layout(object):
+    """Padded flat grid with the per-move masks and offsets"""
+
+    def __init__(self, passable, costs, weights=None):
+        height, width = passable.shape
+        self.shape = (height, width)
+        self.stride = width + 2
+
+        padded = np.zeros((height + 2, width + 2), dtype=bool)
+        padded[1:-1, 1:-1] = passable
+        self.passable = padded.ravel()
+
+        self.weights = np.ones((height + 2, width + 2), dtype=np.int64)
+        if weights is not None:
+            self.weights[1:-1, 1:-1] = np.asarray(weights).reshape(height, width)
+        self.weights = self.weights.ravel()
+
+        self.moves = []
+        for action, cost in costs.items():
+            dx, dy = move_offset(action)
+            offset = dy * self.stride + dx
+            allowed = self.passable & self.shift(self.passable, -offset)
+            if dx and dy:
+                allowed &= self.shift(self.passable, -dx) & self.shift(self.passable, -dy * self.stride)
+            self.moves.append((offset, cost, allowed))
+
+    @staticmethod
+    def shift(mask, offset):
+        """result[i + offset] = mask[i] (False where nothing shifts in)"""
+        result = np.zeros_like(mask)
+        if offset > 0:
+            result[offset:] = mask[:-offset]
+        elif offset < 0:
+            result[:offset] = mask[-offset:]
+        else:
+            result[:] = mask
+        return result
+
+    def flat(self, sources):
+        return np.array([(y + 1) * self.stride + x + 1 for x, y in sources], dtype=np.int64)
+
+    def unpad(self, array):
+        height, width = self.shape
+        return array.reshape(height + 2, width + 2)[1:-1, 1:-1].copy()
+
+
+# -------------------------------------------------------------------------
+# UNIT COSTS: WAVEFRONT
+# -------------------------------------------------------------------------
+
+def wavefront(passable, sources, costs=FOUR_CONNECTED, reverse=False):
+    """
+    Step counts from (or to, if reverse) the sources, ignoring the cost values.
+    sources: iterable of (x, y) cells
+    """
+    layout = _Layout(passable, costs)
+    distance = np.full(layout.passable.size, UNREACHABLE, dtype=np.int64)
+    parent = np.full(layout.passable.size, -1, dtype=np.int8)
+    unvisited = layout.passable.copy()
+
+    frontier = np.unique(layout.flat(sources))
+    distance[frontier] = 0
+    unvisited[frontier] = False
+
+    level = 0
+    while frontier.size:
+        level += 1
+        reached = []
+        for move, (offset, _, allowed) in enumerate(layout.moves):
+            if reverse:
+                # Cells that reach the frontier with this move
+                new = frontier - offset
+                new = new[allowed[new]]
+            else:
+                new = frontier[allowed[frontier]] + offset
+            new = new[unvisited[new]]
+            unvisited[new] = False
+            parent[new] = move
+            reached.append(new)
+        frontier = np.concatenate(reached)
+        distance[frontier] = level
+
+    return layout.unpad(distance), layout.unpad(parent)
+
+
+# -------------------------------------------------------------------------
+# SMALL INTEGER COSTS: DIAL'S ALGORITHM
+# -------------------------------------------------------------------------
+
+def dial(passable, sources, costs, weights=None, reverse=False):
+    """
+    Cheapest cost from (or to, if reverse) the sources, where entering a cell costs
+    costs[action] * weight of the cell. Costs and weights must be integers.
+    """
+    if any(cost != int(cost) or cost < 1 for cost in costs.values()):
+        raise ValueError("El algoritmo de Dial requiere costes enteros positivos.")
+    costs = {action: int(cost) for action, cost in costs.items()}
+
+    layout = _Layout(passable, costs, weights)
+    weights = layout.weights
+    distance = np.full(layout.passable.size, np.iinfo(np.int64).max, dtype=np.int64)
+    parent = np.full(layout.passable.size, -1, dtype=np.int8)
+
+    start = np.unique(layout.flat(sources))
+    distance[start] = 0
+    buckets = {0: [start]}
+
+    while buckets:
+        # Every pending key lies within one maximum edge cost of the current one,
+        # so there are never more buckets than that
+        d = min(buckets)
+        cells = np.unique(np.concatenate(buckets.pop(d)))
+        cells = cells[distance[cells] == d]
+
+        for move, (offset, cost, allowed) in enumerate(layout.moves):
+            if reverse:
+                target = cells - offset
+                ok = allowed[target]
+                target, step = target[ok], cost * weights[cells[ok]]
+            else:
+                source = cells[allowed[cells]]
+                target = source + offset
+                step = cost * weights[target]
+
+            new = d + step
+            better = new < distance[target]
+            target, new = target[better], new[better]
+            distance[target] = new
+            parent[target] = move
+            for key in np.unique(new):
+                buckets.setdefault(int(key), []).append(target[new == key])
+
+    distance[distance == np.iinfo(np.int64).max] = UNREACHABLE
+    return layout.unpad(distance), layout.unpad(parent)
+
+
+# -------------------------------------------------------------------------
+# PROBLEM HELPERS
+# -------------------------------------------------------------------------
+
+def distance_field(problem, sources=None, reverse=False):
+    """
+    Distance field of a GameWalkPuzzle-like problem (board, costs, weights), using
+    the wavefront when every step costs the same and Dial's algorithm otherwise.
+    """
+    if sources is None:
+        sources = [problem.initial_state]
+    passable = passable_mask(problem.board)
+
+    step_costs = set(problem.costs.values())
+    if len(step_costs) == 1 and problem.min_weight == problem.max_weight:
+        distance, parent = wavefront(passable, sources, problem.costs, reverse=reverse)
+        scale = step_costs.pop() * problem.min_weight
+        return np.where(distance > 0, distance * scale, distance), parent
+
+    weights = np.array(problem.weights, dtype=np.int64)
+    return dial(passable, sources, problem.costs, weights=weights, reverse=reverse)
+
+
+def reachability(problem):
+    """(reachable cells, free cells) counted from the vehicle with the problem's moves"""
+    passable = passable_mask(problem.board)
+    distance, _ = wavefront(passable, [problem.initial_state], problem.costs)
+    return int((distance >= 0).sum()), int(passable.sum())
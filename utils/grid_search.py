@@ -0,0 +1,490 @@
+"""
+Grid Search Algorithms
+
+Search algorithms that work directly on the grid of a `GameWalkPuzzle`-like problem
+(`board`, `costs`, `weights`, `width`, `min_weight`, `actions()`, `result()`) instead
+of going through simpleai's generic `_search` loop.
+
+They take the same arguments as the simpleai algorithms (`problem, graph_search,
+viewer`), send the same viewer events and return a simpleai `SearchNode`, so they
+can be listed next to `astar` or `uniform_cost` in `run_case`.
+
+## Frontiers
+
+`grid_astar` / `grid_uniform_cost` keep their open list in a pluggable frontier.
+None of them supports decrease-key: a better path pushes a new entry and the old
+one is skipped when popped (lazy deletion).
+
+- **heap**: binary heap (`heapq`), any numeric f; ties broken exactly on g
+- **bucket**: Dial's bucket queue indexed by integer f, O(1) push and pop when
+  step costs are small integers
+- **radix**: radix heap for integer f that never decreases (consistent heuristics);
+  buckets by the highest bit where a key differs from the last popped one
+
+`select_frontier()` picks one from the cost table: a binary heap when some cost is
+not an integer, a bucket queue when the most expensive step is at most
+`SMALL_STEP_COST`, and a radix heap otherwise.
+
+The bucket queue and the radix heap index entries by integer f, so they require
+integer `COSTS` (weights always are); asking `grid_astar` for one of them with
+non-integer costs raises `ValueError`. With integer costs g is exact and f is
+rounded down, which keeps a consistent heuristic consistent.
+
+With `tie_break="high_g"` (default) the node with the deepest path wins among equal
+f, which on grids expands far fewer nodes than the reverse. The bucket structures
+group each bucket by g so the tie-break is exact for them too.
+
+## Any-Angle Movement (Theta*)
+
+Theta* expands the 8 (or 4) grid neighbours like A*, but links each successor to
+the PARENT of the expanded cell whenever both can see each other. Paths become
+straight segments between waypoints, which is what a vehicle actually drives.
+
+- Line of sight walks the cells crossed by the segment between two cell centres
+  with integer arithmetic only; a segment going exactly through a wall corner is
+  blocked, like corner-cutting diagonal moves
+- A segment (dx, dy) costs `hypot(dx * cx, dy * cy)` times the heaviest cell it
+  crosses, where cx / cy are the `COSTS` of the horizontal / vertical direction;
+  a single diagonal step costs its own `COSTS` entry, exactly as under A*
+- Since that weight is pessimistic, the shortcut to the parent is only taken when
+  it is cheaper than going through the expanded cell
+- The heuristic is the same segment cost straight to the goal on the lightest
+  terrain (scaled down if a diagonal `COSTS` entry is cheaper than its Euclidean
+  combination), so it is consistent
+"""
+
+import heapq
+from collections import deque
+from math import hypot
+
+from simpleai.search.models import SearchNode
+
+from utils.distance_transform import move_offset
+
+# Action name given to the straight segments of an any-angle path
+ANY_ANGLE = "any-angle"
+
+# Steps up to this cost (COSTS x weight) use a bucket queue, costlier ones a radix heap
+SMALL_STEP_COST = 64
+
+TIE_BREAKS = ("high_g", "low_g", "fifo")
+
+
+# -------------------------------------------------------------------------
+# FRONTIERS
+# -------------------------------------------------------------------------
+
+class BinaryHeap(object):
+    """heapq frontier; ties on f are broken on g, then by insertion order"""
+
+    def __init__(self, tie_break="high_g"):
+        self.heap = []
+        self.counter = 0
+        self.sign = {"high_g": -1, "low_g": 1, "fifo": 0}[tie_break]
+
+    def __len__(self):
+        return len(self.heap)
+
+    def push(self, f, g, item):
+        heapq.heappush(self.heap, (f, self.sign * g, self.counter, item))
+        self.counter += 1
+
+    def pop(self):
+        return heapq.heappop(self.heap)[3]
+
+
+def _tie_key(tie_break):
+    """Picks the g to pop first among the keys of a bucket (None: single key 0)"""
+    return {"high_g": max, "low_g": min, "fifo": None}[tie_break]
+
+
+class BucketQueue(object):
+    """Dial's bucket queue: one bucket per integer f, scanned from the lowest one"""
+
+    def __init__(self, tie_break="high_g"):
+        # Each bucket maps g -> entries, so ties on f are broken exactly
+        self.choose = _tie_key(tie_break)
+        self.buckets = []
+        self.cursor = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def push(self, f, g, item):
+        f = int(f)
+        buckets = self.buckets
+        while f >= len(buckets):
+            buckets.append({})
+        if not self.choose:
+            g = 0
+        entries = buckets[f].get(g)
+        if entries is None:
+            buckets[f][g] = entries = deque()
+        entries.append(item)
+        # An inconsistent heuristic can push below the cursor; just move back
+        if f < self.cursor:
+            self.cursor = f
+        self.size += 1
+
+    def pop(self):
+        buckets = self.buckets
+        while not buckets[self.cursor]:
+            self.cursor += 1
+        bucket = buckets[self.cursor]
+        g = self.choose(bucket) if self.choose else 0
+        entries = bucket[g]
+        item = entries.popleft()
+        if not entries:
+            del bucket[g]
+        self.size -= 1
+        return item
+
+
+class RadixHeap(object):
+    """Radix heap for monotone integer keys"""
+
+    def __init__(self, tie_break="high_g"):
+        # Bucket 0 holds the keys equal to the last popped one, as g -> entries
+        self.choose = _tie_key(tie_break)
+        self.buckets = [{}] + [[] for _ in range(64)]
+        self.last = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def push(self, f, g, item):
+        # Keys below the last popped one (inconsistent heuristics) would be popped
+        # next by any frontier, which is what the lowest bucket does with them
+        f = int(f)
+        if f < self.last:
+            f = self.last
+        self._place(f, g, item)
+        self.size += 1
+
+    def _place(self, f, g, item):
+        index = (f ^ self.last).bit_length()
+        if index:
+            self.buckets[index].append((f, g, item))
+            return
+        if not self.choose:
+            g = 0
+        lowest = self.buckets[0]
+        entries = lowest.get(g)
+        if entries is None:
+            lowest[g] = entries = deque()
+        entries.append(item)
+
+    def pop(self):
+        lowest = self.buckets[0]
+        if not lowest:
+            index = 1
+            while not self.buckets[index]:
+                index += 1
+            entries = self.buckets[index]
+            self.buckets[index] = []
+            self.last = min(f for f, _, _ in entries)
+            for f, g, item in entries:
+                self._place(f, g, item)
+        g = self.choose(lowest) if self.choose else 0
+        entries = lowest[g]
+        item = entries.popleft()
+        if not entries:
+            del lowest[g]
+        self.size -= 1
+        return item
+
+
+FRONTIERS = {
+    "heap": BinaryHeap,
+    "bucket": BucketQueue,
+    "radix": RadixHeap,
+}
+
+
+def select_frontier(problem):
+    """Frontier name best suited to the costs and weights of problem"""
+    costs = list(problem.costs.values())
+    if any(cost != int(cost) for cost in costs):
+        return "heap"
+    if max(costs) * problem.max_weight <= SMALL_STEP_COST:
+        return "bucket"
+    return "radix"
+
+
+# -------------------------------------------------------------------------
+# LINE OF SIGHT
+# -------------------------------------------------------------------------
+
+def line_of_sight(problem, a, b):
+    """
+    Heaviest weight among the cells crossed from a to b (a excluded), or 0 if
+    the segment is blocked by a wall.
+    """
+    board, weights, width = problem.board, problem.weights, problem.width
+    x, y = a
+    x1, y1 = b
+    dx, dy = abs(x1 - x), abs(y1 - y)
+    sx = 1 if x1 > x else -1
+    sy = 1 if y1 > y else -1
+    error = dx - dy
+    dx, dy = 2 * dx, 2 * dy
+    heaviest = 0
+
+    steps = (dx + dy) // 2
+    while steps > 0:
+        if error > 0:
+            x += sx
+            error -= dy
+        elif error < 0:
+            y += sy
+            error += dx
+        else:
+            # Exactly through a corner: both side cells must be free
+            if board[y][x + sx] == "#" or board[y + sy][x] == "#":
+                return 0
+            x += sx
+            y += sy
+            error += dx - dy
+            steps -= 1
+        steps -= 1
+
+        weight = weights[y * width + x]
+        if weight == 0:
+            return 0
+        if weight > heaviest:
+            heaviest = weight
+    return heaviest
+
+
+def euclidean_cost(problem, dx, dy):
+    """hypot of the (dx, dy) displacement scaled by the horizontal / vertical COSTS"""
+    cx = problem.costs["right"] if dx > 0 else problem.costs["left"]
+    cy = problem.costs["down"] if dy > 0 else problem.costs["up"]
+    return hypot(dx * cx, dy * cy)
+
+
+def segment_cost(problem, a, b, weight=None):
+    """Cost of driving straight from a to b (see module docstring)"""
+    if weight is None:
+        weight = line_of_sight(problem, a, b)
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    if abs(dx) == 1 and abs(dy) == 1:
+        action = ("down" if dy > 0 else "up") + ("-right" if dx > 0 else "-left")
+        if action in problem.costs:
+            return weight * problem.costs[action]
+    return weight * euclidean_cost(problem, dx, dy)
+
+
+# -------------------------------------------------------------------------
+# VIEWER HELPERS
+# -------------------------------------------------------------------------
+
+class _FringeView(object):
+    """Stands in for simpleai's `fringe.sorted()` list without copying the queue"""
+
+    def __init__(self, size):
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        return f"<fringe with {self.size} nodes>"
+
+
+def _solution(problem, parent, g, state, action):
+    """Build the SearchNode chain from the parent map, as simpleai returns it"""
+    states = [state]
+    while parent[state] != state:
+        state = parent[state]
+        states.append(state)
+    states.reverse()
+
+    node = SearchNode(state=states[0], problem=problem)
+    for depth, state in enumerate(states[1:], start=1):
+        node = SearchNode(state=state, parent=node, action=action(node.state, state),
+                          cost=g[state], problem=problem, depth=depth)
+    return node
+
+
+# -------------------------------------------------------------------------
+# A* / UNIFORM COST
+# -------------------------------------------------------------------------
+
+def grid_astar(problem, graph_search=True, viewer=None, frontier=None, tie_break="high_g",
+               use_heuristic=True):
+    '''
+    A* search with a pluggable frontier (see module docstring).
+
+    Always a graph search; graph_search is accepted for compatibility with the
+    simpleai algorithms. frontier is "heap", "bucket", "radix" or None to pick
+    it with select_frontier(). Requires: SearchProblem.actions,
+    SearchProblem.result, SearchProblem.is_goal, SearchProblem.cost, and
+    SearchProblem.heuristic (unless use_heuristic=False).
+    '''
+    if tie_break not in TIE_BREAKS:
+        raise ValueError(f"tie_break debe ser uno de {TIE_BREAKS}.")
+    if viewer:
+        viewer.event('started')
+
+    heuristic = problem.heuristic if use_heuristic else (lambda state: 0)
+    start = problem.initial_state
+
+    g = {start: 0}
+    parent = {start: start}
+    actions = {}
+    closed = set()
+    automatic = select_frontier(problem)
+    if frontier not in (None, "heap") and automatic == "heap":
+        raise ValueError(f"La frontera '{frontier}' requiere costes enteros.")
+    fringe = FRONTIERS[frontier or automatic](tie_break)
+    fringe.push(heuristic(start), 0, start)
+
+    while fringe:
+        if viewer:
+            viewer.event('new_iteration', _FringeView(len(fringe)))
+
+        state = fringe.pop()
+        if state in closed:
+            continue  # stale entry, a cheaper one was already expanded
+
+        if problem.is_goal(state):
+            node = _solution(problem, parent, g, state, lambda a, b: actions[b])
+            if viewer:
+                viewer.event('chosen_node', node, True)
+                viewer.event('finished', _FringeView(len(fringe)), node, 'goal found')
+            return node
+        if viewer:
+            viewer.event('chosen_node', SearchNode(state=state, cost=g[state], problem=problem), False)
+
+        closed.add(state)
+        cost_here = g[state]
+        successors = []
+
+        for action in problem.actions(state):
+            new_state = problem.result(state, action)
+            if new_state in closed:
+                continue
+            cost = cost_here + problem.cost(state, action, new_state)
+            if cost < g.get(new_state, float("inf")):
+                g[new_state] = cost
+                parent[new_state] = state
+                actions[new_state] = action
+                fringe.push(cost + heuristic(new_state), cost, new_state)
+                if viewer:
+                    successors.append(SearchNode(state=new_state, action=action,
+                                                 cost=cost, problem=problem))
+
+        if viewer:
+            viewer.event('expanded', [SearchNode(state=state, problem=problem)], [successors])
+
+    if viewer:
+        viewer.event('finished', _FringeView(0), None, 'goal not found')
+
+
+def grid_uniform_cost(problem, graph_search=True, viewer=None, frontier=None, tie_break="high_g"):
+    '''
+    Uniform cost search with a pluggable frontier (grid_astar without heuristic).
+    '''
+    return grid_astar(problem, graph_search=graph_search, viewer=viewer, frontier=frontier,
+                      tie_break=tie_break, use_heuristic=False)
+
+
+def make_grid_astar(frontier, tie_break="high_g"):
+    """grid_astar bound to one frontier, named after it for the metrics tables"""
+    def search(problem, graph_search=True, viewer=None):
+        return grid_astar(problem, graph_search=graph_search, viewer=viewer,
+                          frontier=frontier, tie_break=tie_break)
+
+    search.__name__ = f"grid_astar_{frontier}"
+    search.__doc__ = grid_astar.__doc__
+    return search
+
+
+# -------------------------------------------------------------------------
+# THETA*
+# -------------------------------------------------------------------------
+
+def theta_star(problem, graph_search=True, viewer=None):
+    '''
+    Theta* any-angle search.
+
+    Always a graph search; graph_search is accepted for compatibility with the
+    simpleai algorithms. Requires: the grid attributes of GameWalkPuzzle and
+    "left", "right", "up" and "down" entries in its costs.
+    '''
+    if viewer:
+        viewer.event('started')
+
+    start, goal = problem.initial_state, problem.goal
+    weights, width, min_weight = problem.weights, problem.width, problem.min_weight
+
+    # A diagonal step cheaper than its Euclidean combination would make the
+    # straight-line estimate overestimate, so the estimate is scaled down to it
+    scale = min([1.0] + [problem.costs[action] / euclidean_cost(problem, *move_offset(action))
+                         for action in problem.costs if problem.is_diagonal(action)])
+
+    def heuristic(state):
+        return scale * min_weight * euclidean_cost(problem, goal[0] - state[0], goal[1] - state[1])
+
+    g = {start: 0.0}
+    parent = {start: start}
+    closed = set()
+    fringe = BinaryHeap()
+    fringe.push(heuristic(start), 0.0, start)
+
+    while fringe:
+        if viewer:
+            viewer.event('new_iteration', _FringeView(len(fringe)))
+
+        state = fringe.pop()
+        if state in closed:
+            continue  # stale entry, a cheaper one was already expanded
+
+        if problem.is_goal(state):
+            node = _solution(problem, parent, g, state, lambda a, b: ANY_ANGLE)
+            if viewer:
+                viewer.event('chosen_node', node, True)
+                viewer.event('finished', _FringeView(len(fringe)), node, 'goal found')
+            return node
+        if viewer:
+            viewer.event('chosen_node', SearchNode(state=state, cost=g[state], problem=problem), False)
+
+        closed.add(state)
+        grandparent = parent[state]
+        successors = []
+
+        for action in problem.actions(state):
+            new_state = problem.result(state, action)
+            if new_state in closed:
+                continue
+
+            # Path 1: through the expanded cell, as A* would
+            via = state
+            cost = g[state] + segment_cost(problem, state, new_state,
+                                           weight=weights[new_state[1] * width + new_state[0]])
+
+            # Path 2: straight from its parent; on weighted terrain it is not
+            # always cheaper, so it only wins when it actually costs less
+            if grandparent != state:
+                weight = line_of_sight(problem, grandparent, new_state)
+                if weight:
+                    shortcut = g[grandparent] + segment_cost(problem, grandparent, new_state, weight=weight)
+                    if shortcut <= cost:
+                        via, cost = grandparent, shortcut
+
+            if cost < g.get(new_state, float("inf")):
+                g[new_state] = cost
+                parent[new_state] = via
+                fringe.push(cost + heuristic(new_state), cost, new_state)
+                if viewer:
+                    successors.append(SearchNode(state=new_state, action=action,
+                                                 cost=cost, problem=problem))
+
+        if viewer:
+            viewer.event('expanded', [SearchNode(state=state, problem=problem)], [successors])
+
+    if viewer:
+        viewer.event('finished', _FringeView(0), None, 'goal not found')
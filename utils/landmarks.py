@@ -0,0 +1,157 @@
+"""
+Landmark (ALT) Heuristic Tables
+
+Manhattan and Chebyshev distances ignore walls, so A* still floods dead-end corridors.
+ALT (A*, Landmarks, Triangle inequality) precomputes exact distances from and to a few
+LANDMARK cells and turns them into a lower bound that knows about the walls:
+
+    d(v, goal) >= d(L, goal) - d(L, v)      (forward distances from L)
+    d(v, goal) >= d(v, L) - d(goal, L)      (backward distances to L)
+
+The heuristic is the maximum of both bounds over all landmarks. It is admissible and
+consistent for ANY start/goal pair on the map, including the asymmetric `COSTS` and
+the terrain weights, so the tables are built once per map and cost table.
+
+## Tables
+
+- Shape `(K, 2, width * height)`: forward and backward distance of every cell,
+  computed with the vectorized distance transform (`utils/distance_transform.py`)
+- `uint16` when every finite distance fits, `uint32` otherwise; the dtype maximum
+  marks unreachable cells
+- Saved as a plain `.npy` file, so `LandmarkTables.load()` can memory-map it
+- The bound only depends on the goal, so it is computed for every cell at once, in
+  one pass over the table, the first time a goal is asked for (the last
+  `GOAL_ENTRIES` goals are kept)
+
+## Landmark Selection
+
+Farthest-point: the first landmark is the reachable cell farthest from the vehicle,
+each next one the reachable cell farthest from all the landmarks chosen so far.
+"""
+
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from utils.distance_transform import distance_field
+from utils.route_cache import map_digest
+
+# Per-cell bounds kept for the most recently used goals
+GOAL_ENTRIES = 8
+
+# Tables built in this process, by map and cost table; only the most recently used
+# TABLE_ENTRIES are kept, so long runs over many maps do not keep every table alive
+TABLE_ENTRIES = 4
+_TABLES = OrderedDict()
+
+
+class LandmarkTables(object):
+    """Forward/backward landmark distance tables and the ALT heuristic"""
+
+    def __init__(self, table):
+        self.table = table
+        self.inf = np.iinfo(table.dtype).max
+        self._goals = OrderedDict()
+
+    @property
+    def landmarks(self):
+        """Flat index of every landmark (its forward distance to itself is 0)"""
+        return [int(np.argmin(row[0])) for row in self.table]
+
+    # -------------------------------------------------------------------------
+    # BUILD / LOAD
+    # -------------------------------------------------------------------------
+
+    @classmethod
+    def build(cls, problem, count=8):
+        """Pick `count` landmarks by farthest-point selection and compute their tables"""
+        def field(index, reverse=False):
+            source = (index % problem.width, index // problem.width)
+            return distance_field(problem, [source], reverse=reverse)[0].ravel()
+
+        rows = []
+        # Unreachable cells are -1, so they are never picked and stay out of the minimum
+        closest = field(problem.initial_state[1] * problem.width + problem.initial_state[0])
+        for _ in range(count):
+            landmark = int(np.argmax(closest))
+            if rows and closest[landmark] == 0:
+                break  # every reachable cell is already a landmark
+            forward = field(landmark)
+            rows.append((forward, field(landmark, reverse=True)))
+            closest = forward if len(rows) == 1 else np.minimum(closest, forward)
+
+        distances = np.array(rows)
+        if np.any(distances != np.round(distances)):
+            raise ValueError("ALT requiere costes enteros.")
+        dtype = np.uint16 if distances.max() < np.iinfo(np.uint16).max else np.uint32
+        table = np.where(distances >= 0, distances, np.iinfo(dtype).max).astype(dtype)
+        return cls(table)
+
+    def save(self, path):
+        np.save(path, self.table)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        return cls(np.load(path, mmap_mode="r" if mmap else None))
+
+    # -------------------------------------------------------------------------
+    # HEURISTIC
+    # -------------------------------------------------------------------------
+
+    def bounds(self, goal):
+        """Lower bound of the cost from every cell to cell `goal`, as a list"""
+        if goal in self._goals:
+            self._goals.move_to_end(goal)
+            return self._goals[goal]
+
+        bound = np.zeros(self.table.shape[2], dtype=np.int64)
+        for forward, backward in self.table:
+            forward = forward.astype(np.int64)
+            backward = backward.astype(np.int64)
+            # Bounds that involve an unreachable cell say nothing and are skipped
+            if forward[goal] != self.inf:
+                bound = np.maximum(bound, np.where(forward != self.inf, forward[goal] - forward, 0))
+            if backward[goal] != self.inf:
+                bound = np.maximum(bound, np.where(backward != self.inf, backward - backward[goal], 0))
+
+        self._goals[goal] = bound.tolist()
+        if len(self._goals) > GOAL_ENTRIES:
+            self._goals.popitem(last=False)
+        return self._goals[goal]
+
+    def heuristic(self, index, goal):
+        """Lower bound of the cost from cell `index` to cell `goal` (flat indices)"""
+        return self.bounds(goal)[index]
+
+
+def tables_for(problem, count=8, directory=None):
+    """
+    Landmark tables for the map and costs of problem, built once while they stay
+    among the TABLE_ENTRIES most recently used.
+    With `directory`, tables are also saved there and memory-mapped on later runs.
+    """
+    digest = map_digest(problem)
+    digest.update(repr(sorted(problem.costs.items())).encode("utf-8"))
+    key = f"{digest.hexdigest()[:32]}-{count}"
+
+    path = os.path.join(directory, f"alt-{key}.npy") if directory else None
+    if key in _TABLES:
+        _TABLES.move_to_end(key)
+    elif path and os.path.exists(path):
+        _TABLES[key] = LandmarkTables.load(path)
+    else:
+        _TABLES[key] = LandmarkTables.build(problem, count=count)
+    if path and not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        _TABLES[key].save(path)
+
+    tables = _TABLES[key]
+    if len(_TABLES) > TABLE_ENTRIES:
+        _TABLES.popitem(last=False)
+    return tables
+
+
+def clear_tables():
+    """Forget every table built in this process (saved files are kept)"""
+    _TABLES.clear()
@@ -0,0 +1,446 @@
+"""
+Cooperative Multi-Vehicle Pathfinding
+
+Plans several vehicles on the same map so that no two of them are ever in the same
+cell at the same time step, nor swap cells through each other. Vehicles are searched
+in (cell, time) space; every move (or wait) takes one time step and costs its usual
+`COSTS` x weight (`wait_cost` for waiting).
+
+## Reservation Table
+
+`ReservationTable` hashes `(cell, time) -> agent + 1`, so its memory grows with the
+steps actually reserved, not with the map or the time horizon. Vehicles that finish
+stay parked on their goal, recorded in a separate per-cell dict.
+
+Windowed planning only looks `window` steps ahead, so `RingReservationTable` keeps
+those steps in a `(window + 1, cells)` array indexed by `time % (window + 1)` and
+resets only the entries it wrote when the vehicles replan.
+
+## Planners (`FleetPlanner`)
+
+- **plan_prioritized()**: vehicles are planned one after another, each avoiding the
+  reservations of the previous ones (cooperative A*)
+- **plan_windowed()**: the same, but only `window` steps ahead; every `replan_every`
+  steps all vehicles replan from where they are (windowed hierarchical cooperative A*)
+- **plan_cbs()**: conflict-based search for small fleets: plans vehicles independently,
+  then repeatedly splits on the first collision by forbidding it to one or the other,
+  returning the cheapest collision-free combination
+
+The low-level search is A* in (cell, time) with the exact single-vehicle distance to
+the goal as heuristic (a backward distance field, `utils/distance_transform.py`).
+Paths are lists of flat cell indices, one per time step from time 0.
+"""
+
+import heapq
+
+import numpy as np
+
+from utils.distance_transform import distance_field
+from utils.grid_search import BinaryHeap
+
+# Returned by last_blocked() for cells another vehicle is parked on for good
+FOREVER = np.iinfo(np.int64).max
+
+
+# -------------------------------------------------------------------------
+# RESERVATIONS
+# -------------------------------------------------------------------------
+
+class ReservationTable(object):
+    """Hashed (cell, time) reservations shared by all vehicles"""
+
+    def __init__(self, horizon):
+        # Latest time step a search may reach, counted from base
+        self.horizon = horizon
+        self.base = 0
+        self.slots = {}
+        self.parked = {}
+        self.last = {}
+        # Last reserved time step: from then on only parked vehicles remain
+        self.settled = -1
+
+    def clear(self, base=0):
+        self.slots.clear()
+        self.parked.clear()
+        self.last.clear()
+        self.settled = -1
+        self.base = base
+
+    def reserve(self, agent, path, start_time=0, park=True):
+        """Reserve path (one cell per step from start_time); park on its last cell"""
+        for step, cell in enumerate(path):
+            t = start_time + step
+            self.slots[(cell, t)] = agent + 1
+            self.last[cell] = max(self.last.get(cell, -1), t)
+        self.settled = max(self.settled, start_time + len(path) - 1)
+        if park:
+            self.parked[path[-1]] = (agent + 1, start_time + len(path) - 1)
+            self.last[path[-1]] = FOREVER
+
+    def occupant(self, cell, t):
+        """agent + 1 of the vehicle on cell at time t, or 0"""
+        parked = self.parked.get(cell)
+        if parked is not None and parked[1] <= t:
+            return parked[0]
+        return self.slots.get((cell, t), 0)
+
+    def vertex_blocked(self, agent, cell, t):
+        occupant = self.occupant(cell, t)
+        return occupant != 0 and occupant != agent + 1
+
+    def edge_blocked(self, agent, u, v, t):
+        """Moving u -> v between t and t + 1 would swap with another vehicle"""
+        other = self.occupant(v, t)
+        return other != 0 and other != agent + 1 and self.occupant(u, t + 1) == other
+
+    def last_blocked(self, agent, cell):
+        """Last time step another vehicle uses cell (FOREVER if one parks there)"""
+        return self.last.get(cell, -1)
+
+
+class RingReservationTable(ReservationTable):
+    """
+    Reservations of the next `horizon` time steps in a (horizon, cells) array indexed
+    by time % horizon, for windowed planning. Vehicles never park in it.
+    """
+
+    def __init__(self, cells, horizon, agents):
+        super().__init__(horizon)
+        dtype = np.int16 if agents < np.iinfo(np.int16).max else np.int32
+        self.slots = np.zeros((horizon, cells), dtype=dtype)
+        self.last = np.full(cells, -1, dtype=np.int64)
+        self.written = []
+
+    def clear(self, base=0):
+        # Only the entries written since the last clear are reset
+        for row, cell in self.written:
+            self.slots[row, cell] = 0
+            self.last[cell] = -1
+        self.written = []
+        self.settled = -1
+        self.base = base
+
+    def reserve(self, agent, path, start_time=0):
+        """Reserve path (one cell per step from start_time)"""
+        for step, cell in enumerate(path):
+            t = start_time + step
+            row = t % self.horizon
+            self.slots[row, cell] = agent + 1
+            self.written.append((row, cell))
+            self.last[cell] = max(self.last[cell], t)
+        self.settled = max(self.settled, start_time + len(path) - 1)
+
+    def occupant(self, cell, t):
+        return self.slots[t % self.horizon, cell]
+
+    def last_blocked(self, agent, cell):
+        return self.last[cell]
+
+
+class _Constraints(object):
+    """CBS constraints of one vehicle, with the ReservationTable interface"""
+
+    def __init__(self, horizon, vertex=(), edge=()):
+        self.horizon = horizon
+        self.base = 0
+        self.vertex = set(vertex)
+        self.edge = set(edge)
+        self.settled = max([t for _, t in self.vertex] + [t + 1 for _, _, t in self.edge] + [-1])
+
+    def vertex_blocked(self, agent, cell, t):
+        return (cell, t) in self.vertex
+
+    def edge_blocked(self, agent, u, v, t):
+        return (u, v, t) in self.edge
+
+    def last_blocked(self, agent, cell):
+        return max((t for c, t in self.vertex if c == cell), default=-1)
+
+
+def find_conflict(paths):
+    """
+    First collision among paths (vehicles wait on their last cell once done), as
+    ("vertex", a, b, cell, t) or ("edge", a, b, (u, v), t) with a moving u -> v
+    while b moves v -> u between t and t + 1. None if they are collision-free.
+    """
+    active = [i for i, path in enumerate(paths) if path]
+    steps = max((len(paths[i]) for i in active), default=0)
+
+    def at(i, t):
+        return paths[i][min(t, len(paths[i]) - 1)]
+
+    for t in range(steps):
+        seen = {}
+        for i in active:
+            cell = at(i, t)
+            if cell in seen:
+                return ("vertex", seen[cell], i, cell, t)
+            seen[cell] = i
+
+        moving = {}
+        for i in active:
+            u, v = at(i, t), at(i, t + 1)
+            if u != v:
+                if (v, u) in moving:
+                    return ("edge", moving[(v, u)], i, (v, u), t)
+                moving[(u, v)] = i
+    return None
+
+
+# -------------------------------------------------------------------------
+# PLANNER
+# -------------------------------------------------------------------------
+
+class FleetPlanner(object):
+    """Multi-vehicle planner on the map, integer costs and weights of a GameWalkPuzzle"""
+
+    def __init__(self, problem, wait_cost=1, horizon=None):
+        self.problem = problem
+        self.width = problem.width
+        self.cells = problem.width * problem.height
+        self.wait_cost = wait_cost
+        self._distances = {}
+
+        # Successors of every free cell as (cell, cost), waiting included
+        self.moves = [[] for _ in range(self.cells)]
+        free = 0
+        for y in range(problem.height):
+            for x in range(problem.width):
+                if problem.board[y][x] == "#":
+                    continue
+                free += 1
+                cell = self.index((x, y))
+                for action in problem.actions((x, y)):
+                    state = problem.result((x, y), action)
+                    self.moves[cell].append((self.index(state), problem.cost((x, y), action, state)))
+                self.moves[cell].append((cell, wait_cost))
+
+        # Longest a vehicle may take (time steps searched), enough to cross the map
+        # while yielding to the others; reservations do not grow with it
+        self.horizon = horizon or max(256, 2 * free)
+
+    def index(self, state):
+        return state[1] * self.width + state[0]
+
+    def state(self, cell):
+        return (cell % self.width, cell // self.width)
+
+    def distances(self, goal):
+        """Exact single-vehicle cost of every cell to goal (-1: unreachable)"""
+        if goal not in self._distances:
+            field, _ = distance_field(self.problem, [self.state(goal)], reverse=True)
+            self._distances[goal] = field.ravel().tolist()
+        return self._distances[goal]
+
+    # -------------------------------------------------------------------------
+    # LOW LEVEL: SPACE-TIME A*
+    # -------------------------------------------------------------------------
+
+    def search(self, agent, start, goal, reservations, start_time=0, window=None):
+        """
+        Cheapest (path, cost) from start at start_time to goal avoiding reservations.
+        With window, the search stops window steps ahead (path may end anywhere).
+        """
+        h = self.distances(goal)
+        if h[start] < 0 or reservations.last_blocked(agent, goal) == FOREVER:
+            return None
+
+        max_time = reservations.base + reservations.horizon - 1
+        # After the last reservation the map no longer changes, so a cell is only
+        # worth expanding once: time is clamped there in the closed set
+        settled = max_time
+        if window is not None:
+            max_time = min(max_time, start_time + window)
+        else:
+            settled = min(settled, max(reservations.settled, start_time) + 1)
+
+        root = (start, start_time)
+        g = {root: 0}
+        parent = {root: None}
+        closed = set()
+        fringe = BinaryHeap()
+        fringe.push(h[start], 0, root)
+
+        while fringe:
+            node = fringe.pop()
+            cell, t = node
+            if (cell, min(t, settled)) in closed:
+                continue
+            closed.add((cell, min(t, settled)))
+
+            arrived = cell == goal and t > reservations.last_blocked(agent, goal)
+            if arrived or (window is not None and t == max_time):
+                path = []
+                while node is not None:
+                    path.append(node[0])
+                    node = parent[node]
+                return path[::-1], g[(cell, t)]
+            if t == max_time:
+                continue
+
+            for nxt, cost in self.moves[cell]:
+                if h[nxt] < 0 or (nxt, min(t + 1, settled)) in closed:
+                    continue
+                if reservations.vertex_blocked(agent, nxt, t + 1):
+                    continue
+                if nxt != cell and reservations.edge_blocked(agent, cell, nxt, t):
+                    continue
+                child = (nxt, t + 1)
+                cost += g[(cell, t)]
+                if cost < g.get(child, float("inf")):
+                    g[child] = cost
+                    parent[child] = (cell, t)
+                    fringe.push(cost + h[nxt], cost, child)
+        return None
+
+    # -------------------------------------------------------------------------
+    # PRIORITIZED PLANNING
+    # -------------------------------------------------------------------------
+
+    def _plan_in_order(self, agents, table, plan_one, wait=None):
+        """
+        Plan every vehicle with plan_one(agent, table) -> path or None, in list order.
+        A vehicle that fails is moved to the front (once) and everybody replans; if it
+        fails again and wait(agent, table) is given, it is reserved waiting where it is
+        before the others plan. Returns the paths (None for vehicles still failing).
+        """
+        order = list(range(len(agents)))
+        promoted = set()
+        waiting = []
+        for attempt in range(2 * len(agents) + 1):
+            if attempt:
+                table.clear(base=table.base)
+            paths = [None] * len(agents)
+            for agent in waiting:
+                paths[agent] = wait(agent, table)
+
+            planned = [agent for agent in order if agent not in waiting]
+            failed = None
+            for agent in planned:
+                paths[agent] = plan_one(agent, table)
+                if paths[agent] is None and failed is None:
+                    failed = agent
+            if failed is None:
+                break
+            if failed not in promoted and planned[0] != failed:
+                promoted.add(failed)
+                order.remove(failed)
+                order.insert(0, failed)
+            elif wait:
+                waiting.append(failed)
+            else:
+                break
+        return paths
+
+    def plan_prioritized(self, agents):
+        """
+        Plan vehicles one after another, each around the ones before it (list order,
+        except that vehicles that cannot be planned get priority and all replan).
+        agents: list of (start, goal) states. Returns one path per vehicle (None if
+        it could not be planned within the horizon).
+        """
+        def plan_one(agent, table):
+            start, goal = agents[agent]
+            found = self.search(agent, self.index(start), self.index(goal), table)
+            if found is None:
+                return None
+            table.reserve(agent, found[0])
+            return found[0]
+
+        table = ReservationTable(self.horizon)
+        return self._plan_in_order(agents, table, plan_one)
+
+    def plan_windowed(self, agents, window=16, replan_every=None, max_steps=None):
+        """
+        Windowed prioritized planning: every replan_every steps (window // 2 by
+        default) all vehicles plan window steps ahead from where they are, with a
+        reservation table only window + 1 steps deep. Returns the driven paths.
+        """
+        replan_every = min(replan_every or max(1, window // 2), window)
+        max_steps = max_steps or self.horizon
+        goals = [self.index(goal) for _, goal in agents]
+        positions = [self.index(start) for start, _ in agents]
+        paths = [[cell] for cell in positions]
+
+        def plan_one(agent, table):
+            found = self.search(agent, positions[agent], goals[agent], table,
+                                start_time=table.base, window=window)
+            if found is None:
+                return None
+            plan = found[0] + [found[0][-1]] * (window + 1 - len(found[0]))
+            table.reserve(agent, plan, start_time=table.base)
+            return plan
+
+        def wait(agent, table):
+            plan = [positions[agent]] * (window + 1)
+            table.reserve(agent, plan, start_time=table.base)
+            return plan
+
+        table = RingReservationTable(self.cells, window + 1, len(agents))
+        t = 0
+        while positions != goals and t < max_steps:
+            table.clear(base=t)
+            plans = self._plan_in_order(agents, table, plan_one, wait)
+            plans = [plan or [cell] * (window + 1) for plan, cell in zip(plans, positions)]
+
+            for step in range(1, replan_every + 1):
+                for agent, plan in enumerate(plans):
+                    positions[agent] = plan[step]
+                    paths[agent].append(plan[step])
+            t += replan_every
+
+        # Drop the waiting at the goal added after the last vehicle arrived
+        for path in paths:
+            while len(path) > 1 and path[-1] == path[-2]:
+                path.pop()
+        return paths
+
+    # -------------------------------------------------------------------------
+    # CONFLICT-BASED SEARCH
+    # -------------------------------------------------------------------------
+
+    def plan_cbs(self, agents, max_nodes=1000):
+        """
+        Optimal (sum of costs) collision-free paths by conflict-based search, or
+        None when no solution is found within max_nodes constraint-tree nodes.
+        """
+        starts = [self.index(start) for start, _ in agents]
+        goals = [self.index(goal) for _, goal in agents]
+
+        def replan(agent, constraints):
+            return self.search(agent, starts[agent], goals[agent], constraints)
+
+        constraints = [_Constraints(self.horizon) for _ in agents]
+        solutions = [replan(agent, constraints[agent]) for agent in range(len(agents))]
+        if None in solutions:
+            return None
+
+        counter = 0
+        open_nodes = [(sum(cost for _, cost in solutions), counter, constraints, solutions)]
+        while open_nodes and counter < max_nodes:
+            _, _, constraints, solutions = heapq.heappop(open_nodes)
+            conflict = find_conflict([path for path, _ in solutions])
+            if conflict is None:
+                return [path for path, _ in solutions]
+
+            kind, a, b, where, t = conflict
+            for agent in (a, b):
+                if kind == "vertex":
+                    child = _Constraints(self.horizon, constraints[agent].vertex | {(where, t)},
+                                         constraints[agent].edge)
+                else:
+                    # a moves where[0] -> where[1], b the opposite way
+                    u, v = where if agent == a else where[::-1]
+                    child = _Constraints(self.horizon, constraints[agent].vertex,
+                                         constraints[agent].edge | {(u, v, t)})
+                found = replan(agent, child)
+                if found is None:
+                    continue
+                child_constraints = list(constraints)
+                child_constraints[agent] = child
+                child_solutions = list(solutions)
+                child_solutions[agent] = found
+                counter += 1
+                heapq.heappush(open_nodes, (sum(cost for _, cost in child_solutions), counter,
+                                            child_constraints, child_solutions))
+        return None
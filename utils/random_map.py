@@ -1,5 +1,10 @@
+import os
 import random
+import sys
 from collections import deque
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.distance_transform import passable_mask, wavefront
 
 def bfs_path_exists(grid, start, goal):
     h, w = len(grid), len(grid[0])
@@ -21,7 +26,11 @@ def bfs_path_exists(grid, start, goal):
                 q.append((nx, ny))
     return False
 
-def generate_random_map(width=9, height=7, wall_prob=0.2, max_tries=100):
+def generate_random_map(width=9, height=7, wall_prob=0.2, max_tries=100, weight_prob=0.0, max_weight=3):
+    # weights are written as a single digit per cell
+    if not 2 <= max_weight <= 9:
+        raise ValueError(f"max_weight debe estar entre 2 y 9: {max_weight}")
+
     for _ in range(max_tries):
         # start with empty grid
         grid = [[' ' for _ in range(width)] for _ in range(height)]
@@ -40,6 +49,13 @@ def generate_random_map(width=9, height=7, wall_prob=0.2, max_tries=100):
                 if random.random() < wall_prob:
                     grid[y][x] = '#'
 
+        # random terrain weights (digits 2..max_weight) on the remaining cells
+        if weight_prob > 0:
+            for y in range(1, height - 1):
+                for x in range(1, width - 1):
+                    if grid[y][x] == ' ' and random.random() < weight_prob:
+                        grid[y][x] = str(random.randint(2, max_weight))
+
         # pick P and T on free cells
         free_cells = [
             (x, y)
@@ -54,8 +70,9 @@ def generate_random_map(width=9, height=7, wall_prob=0.2, max_tries=100):
         free_cells.remove((px, py))
         tx, ty = random.choice(free_cells)
 
-        # check connectivity
-        if not bfs_path_exists(grid, (px, py), (tx, ty)):
+        # check connectivity (vectorized flood fill from P)
+        distance, _ = wavefront(passable_mask(grid), [(px, py)])
+        if distance[ty, tx] < 0:
             continue
 
         # place P and T
@@ -0,0 +1,204 @@
+"""
+Persistent Route Cache
+
+Content-addressed cache of search results, so repeated (map, start, goal, costs,
+algorithm, heuristic) queries do not search again.
+
+## Keys
+
+- The MAP HASH is a SHA-256 of the board (with `T`/`P` cleared) and its cell weights,
+  so editing the map changes the hash and old entries can never be returned for it
+- The ENTRY KEY hashes the map hash together with start, goal, `COSTS`, algorithm,
+  heuristic number and the graph_search flag
+
+## Tiers
+
+1. **Memory**: an LRU `OrderedDict` of decoded results (`memory_entries` items)
+2. **Disk** (optional): a SQLite table of zlib-compressed JSON results; when the
+   stored bytes exceed `max_bytes`, the least recently used rows are evicted
+
+`RouteCache.cached(algorithm)` wraps a simpleai-style algorithm so it can be used
+anywhere the algorithm is; on a hit the solution is rebuilt as a `SearchNode` chain
+and the stats recorded with it are copied into the viewer, including
+`search_seconds`, the time the original search took.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+import zlib
+from collections import OrderedDict
+
+from simpleai.search.models import SearchNode
+
+
+def map_digest(problem):
+    """SHA-256 hasher fed with the board (T/P cleared) and its cell weights"""
+    digest = hashlib.sha256()
+    for row in problem.board:
+        digest.update("".join(" " if c in "TtPp" else c for c in row).encode("utf-8"))
+        digest.update(b"\n")
+    digest.update(problem.weights.tobytes())
+    return digest
+
+
+class RouteCache(object):
+    """Two-tier (memory LRU + SQLite) cache of search results"""
+
+    def __init__(self, path=None, memory_entries=256, max_bytes=64 * 1024 * 1024):
+        self.memory = OrderedDict()
+        self.memory_entries = memory_entries
+        self.max_bytes = max_bytes
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+        self.db = None
+        if path:
+            self.db = sqlite3.connect(path)
+            self.db.execute("CREATE TABLE IF NOT EXISTS routes ("
+                            "key TEXT PRIMARY KEY, map_hash TEXT, value BLOB, "
+                            "size INTEGER, last_used REAL)")
+            self.db.execute("CREATE INDEX IF NOT EXISTS routes_map ON routes (map_hash)")
+            self.db.execute("CREATE INDEX IF NOT EXISTS routes_lru ON routes (last_used)")
+            self.db.commit()
+
+    # -------------------------------------------------------------------------
+    # KEYS
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def map_hash(problem):
+        return map_digest(problem).hexdigest()
+
+    def key(self, problem, algorithm_name, graph_search, map_hash=None):
+        query = json.dumps([
+            map_hash or self.map_hash(problem),
+            problem.initial_state,
+            problem.goal,
+            sorted(problem.costs.items()),
+            algorithm_name,
+            problem.heuristic_number,
+            graph_search,
+        ])
+        return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+    # -------------------------------------------------------------------------
+    # STORAGE
+    # -------------------------------------------------------------------------
+
+    def get(self, key):
+        """Cached value for key, or None"""
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            return self.memory[key][1]
+
+        if self.db is not None:
+            row = self.db.execute("SELECT map_hash, value FROM routes WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self.db.execute("UPDATE routes SET last_used = ? WHERE key = ?", (time.time(), key))
+                self.db.commit()
+                value = json.loads(zlib.decompress(row[1]))
+                self._remember(key, row[0], value)
+                self.stats["disk_hits"] += 1
+                return value
+
+        self.stats["misses"] += 1
+        return None
+
+    def put(self, key, map_hash, value):
+        self._remember(key, map_hash, value)
+        if self.db is not None:
+            blob = zlib.compress(json.dumps(value, separators=(",", ":")).encode("utf-8"))
+            self.db.execute("INSERT OR REPLACE INTO routes VALUES (?, ?, ?, ?, ?)",
+                            (key, map_hash, blob, len(blob), time.time()))
+            self._evict()
+            self.db.commit()
+
+    def invalidate(self, problem):
+        """Drop every entry computed on the map of problem (call it before editing the map)"""
+        map_hash = self.map_hash(problem)
+        for key in [k for k, (h, _) in self.memory.items() if h == map_hash]:
+            del self.memory[key]
+        if self.db is not None:
+            self.db.execute("DELETE FROM routes WHERE map_hash = ?", (map_hash,))
+            self.db.commit()
+
+    def _remember(self, key, map_hash, value):
+        self.memory[key] = (map_hash, value)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def _evict(self):
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM routes").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self.db.execute("SELECT key, size FROM routes ORDER BY last_used").fetchall():
+            self.db.execute("DELETE FROM routes WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    # -------------------------------------------------------------------------
+    # ALGORITHM WRAPPER
+    # -------------------------------------------------------------------------
+
+    def cached(self, algorithm):
+        """Wrap a simpleai-style algorithm so its results are served from the cache"""
+        name = f"{algorithm.__module__}.{algorithm.__name__}"
+
+        def search(problem, graph_search=False, viewer=None):
+            map_hash = self.map_hash(problem)
+            key = self.key(problem, name, graph_search, map_hash=map_hash)
+            value = self.get(key)
+
+            # Entries stored without the search time are searched again, so the
+            # viewer never reports the time of a lookup as the time of a search
+            if value is None or (viewer and "search_seconds" not in value["stats"]):
+                start = time.perf_counter()
+                node = algorithm(problem, graph_search=graph_search, viewer=viewer)
+                elapsed = time.perf_counter() - start
+                path = [[action, state[0], state[1]] for action, state in node.path()] if node else None
+                stats = {}
+                if viewer:
+                    viewer.stats["search_seconds"] = elapsed
+                    stats = dict(viewer.stats)
+                self.put(key, map_hash, {"path": path, "stats": stats})
+                return node
+
+            if viewer:
+                viewer.stats.update(value["stats"])
+            return _rebuild(problem, value["path"])
+
+        search.__name__ = algorithm.__name__
+        search.__doc__ = algorithm.__doc__
+        return search
+
+    # -------------------------------------------------------------------------
+    # REPORTING
+    # -------------------------------------------------------------------------
+
+    def hit_rate(self):
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
+
+    def report(self):
+        return (f"Caché de rutas: {self.hit_rate():.0%} aciertos "
+                f"(memoria {self.stats['memory_hits']}, disco {self.stats['disk_hits']}, "
+                f"fallos {self.stats['misses']})")
+
+
+def _rebuild(problem, path):
+    """SearchNode chain equivalent to the one the algorithm returned"""
+    if path is None:
+        return None
+
+    action, x, y = path[0]
+    node = SearchNode(state=(x, y), action=action, problem=problem)
+    for depth, (action, x, y) in enumerate(path[1:], start=1):
+        state = (x, y)
+        node = SearchNode(state=state, parent=node, action=action, problem=problem, depth=depth,
+                          cost=node.cost + problem.cost(node.state, action, state))
+    return node
@@ -0,0 +1,388 @@
+"""
+Streaming WebSocket Viewer for Search Algorithms
+
+This module provides a browser visualization that keeps up with searches producing
+hundreds of thousands of events, where simpleai's `WebViewer` (which renders a graph
+image and sleeps on every event) becomes unusable.
+
+## Architecture
+
+The visualization is split between the SEARCH THREAD and an ASYNCIO SERVER THREAD:
+
+1. **Search thread** (`StreamViewer`):
+   - The search algorithm (from simpleai) calls `viewer.event()` as usual
+   - Only cell indices are recorded, into small `array('I')` buffers
+   - Every `chunk_size` events the buffers are pushed into a BOUNDED queue
+   - If the queue is full the buffers are kept and merged into the next chunk
+     (or the search blocks, if the server was created with `overflow="block"`),
+     so the search never waits on the network and no cell is lost
+
+2. **Server thread** (`StreamServer`):
+   - Drains the queue once per frame (`fps`) and applies the chunks to a single
+     `bytearray` holding the code of every cell
+   - Each connected client keeps a set of DIRTY cell indices; frames only add to
+     that set, so a slow client receives fewer, larger deltas instead of slowing
+     anybody down
+   - A client whose dirty set covers most of the map gets a full snapshot instead
+
+## Wire Format (little endian, binary WebSocket messages)
+
+- Snapshot: `<BHHH` (type=0, width, height, caption length) + caption (UTF-8)
+  + one byte per cell
+- Delta: `<BIIiI` (type=1, iterations, visited nodes, current cell, count)
+  + `count` uint32 cell indices + `count` uint8 cell codes
+
+## Data Flow
+
+simpleai algorithm → event(name, node) → chunk queue → frame loop → dirty sets → browser
+"""
+
+import asyncio
+import queue
+import struct
+import sys
+import threading
+from array import array
+from http import HTTPStatus
+
+from simpleai.search.viewers import BaseViewer
+from websockets.asyncio.server import serve
+
+# Cell codes shared by the server and the browser
+FREE, WALL, START, GOAL, FRONTIER, VISITED, PATH = range(7)
+
+CELL_CODES = {"#": WALL, "T": START, "P": GOAL}
+
+MSG_SNAPSHOT = 0
+MSG_DELTA = 1
+
+SNAPSHOT_HEADER = struct.Struct("<BHHH")
+DELTA_HEADER = struct.Struct("<BIIiI")
+
+
+class StreamViewer(BaseViewer):
+    """Viewer that forwards cell indices to a StreamServer without blocking the search"""
+
+    def __init__(self, server, map_grid, caption="Search Viewer", chunk_size=512):
+        super().__init__()
+        self.server = server
+        self.width = len(map_grid[0])
+        self.height = len(map_grid)
+        self.chunk_size = chunk_size
+        self.next_flush = chunk_size
+        self.current = -1
+        self.frontier = array("I")
+        self.visited = array("I")
+
+        cells = bytes(CELL_CODES.get(cell.upper(), FREE) for row in map_grid for cell in row)
+        self.server.publish(("map", self.width, self.height, caption, cells), block=True)
+
+    def index(self, state):
+        x, y = state
+        return y * self.width + x
+
+    def event(self, name, *params):
+        """Called by the search algorithm on various events"""
+        # BaseViewer formats the whole fringe into a string on every iteration,
+        # so only the cheap handlers are delegated and the stats are kept here
+        if name == "new_iteration":
+            self.stats["iterations"] += 1
+            self.stats["max_fringe_size"] = max(self.stats["max_fringe_size"], len(params[0]))
+        elif name == "chosen_node":
+            self.stats["visited_nodes"] += 1
+            self.current = self.index(params[0].state)
+            self.visited.append(self.current)
+        elif name == "expanded":
+            for successors in params[1]:
+                self.frontier.extend(self.index(node.state) for node in successors)
+        else:
+            super().event(name, *params)
+
+        if name == "finished":
+            self.flush(block=True)
+            node = params[1]
+            if node is not None:
+                path = array("I", (self.index(state) for _, state in node.path()))
+                self.server.publish(("path", path), block=True)
+        elif len(self.visited) + len(self.frontier) >= self.next_flush:
+            self.flush()
+
+    def flush(self, block=False):
+        """Push the buffered cell indices to the server, keeping them if the queue is full"""
+        published = self.server.publish(("delta", self.frontier, self.visited, self.current,
+                                         self.stats["iterations"], self.stats["visited_nodes"]),
+                                        block=block)
+        if published:
+            self.frontier = array("I")
+            self.visited = array("I")
+            self.next_flush = self.chunk_size
+        else:
+            # Retried once another chunk_size events have been merged in
+            self.next_flush = len(self.visited) + len(self.frontier) + self.chunk_size
+
+    def close(self):
+        self.flush(block=True)
+
+
+class _Client:
+    """Per-connection state: cells changed since the last message sent"""
+
+    def __init__(self):
+        self.dirty = set()
+        self.snapshot = True
+        self.wake = asyncio.Event()
+
+
+class StreamServer:
+    """Asyncio HTTP + WebSocket server running in a background thread"""
+
+    def __init__(self, host="0.0.0.0", port=8000, fps=30, max_queue=64, overflow="drop"):
+        if overflow not in ("drop", "block"):
+            raise ValueError("overflow debe ser 'drop' o 'block'.")
+        self.host = host
+        self.port = port
+        self.fps = fps
+        self.overflow = overflow
+        self.chunks = queue.Queue(maxsize=max_queue)
+        self.deferred = 0
+
+        self.width = 0
+        self.height = 0
+        self.caption = ""
+        self.cells = bytearray()
+        self.current = -1
+        self.iterations = 0
+        self.visited_nodes = 0
+        self.clients = set()
+
+        self._ready = threading.Event()
+        self._thread = None
+
+    def viewer(self, map_grid, caption="Search Viewer", chunk_size=512):
+        """Create a StreamViewer publishing to this server"""
+        return StreamViewer(self, map_grid, caption=caption, chunk_size=chunk_size)
+
+    def publish(self, item, block=False):
+        """Queue a chunk from the search thread; False if the queue is full"""
+        if block or self.overflow == "block":
+            self.chunks.put(item)
+            return True
+        try:
+            self.chunks.put_nowait(item)
+        except queue.Full:
+            self.deferred += 1
+            return False
+        return True
+
+    # -------------------------------------------------------------------------
+    # THREAD LIFECYCLE
+    # -------------------------------------------------------------------------
+
+    def start(self):
+        """Start the server thread and wait until it is listening"""
+        self._thread = threading.Thread(target=asyncio.run, args=(self._serve(),), daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        print(f"Visualización en http://localhost:{self.port}/")
+        return self
+
+    def serve_forever(self):
+        """Keep serving the last state until the user presses Ctrl+C"""
+        print("Pulsa Ctrl+C para detener el servidor...")
+        try:
+            while self._thread.is_alive():
+                self._thread.join(0.5)
+        except KeyboardInterrupt:
+            pass
+        if self.deferred:
+            print(f"Bloques de eventos aplazados (cola llena): {self.deferred}")
+
+    async def _serve(self):
+        async with serve(self._handler, self.host, self.port, process_request=self._http):
+            self._ready.set()
+            await self._frame_loop()
+
+    # -------------------------------------------------------------------------
+    # FRAME COALESCING
+    # -------------------------------------------------------------------------
+
+    async def _frame_loop(self):
+        while True:
+            await asyncio.sleep(1 / self.fps)
+            changed = self._drain()
+            if changed:
+                for client in self.clients:
+                    client.dirty |= changed
+                    client.wake.set()
+
+    def _drain(self):
+        """Apply every queued chunk to the cell array, returning the changed indices"""
+        changed = set()
+        cells = self.cells
+        while True:
+            try:
+                item = self.chunks.get_nowait()
+            except queue.Empty:
+                return changed
+
+            kind = item[0]
+            if kind == "map":
+                _, self.width, self.height, self.caption, initial = item
+                self.cells = cells = bytearray(initial)
+                self.current = -1
+                self.iterations = self.visited_nodes = 0
+                changed.clear()
+                for client in self.clients:
+                    client.dirty.clear()
+                    client.snapshot = True
+                    client.wake.set()
+            elif kind == "delta":
+                _, frontier, visited, self.current, self.iterations, self.visited_nodes = item
+                for i in frontier:
+                    if cells[i] == FREE:
+                        cells[i] = FRONTIER
+                        changed.add(i)
+                for i in visited:
+                    if cells[i] in (FREE, FRONTIER):
+                        cells[i] = VISITED
+                        changed.add(i)
+                # The current cell travels in the header, so it must reach the client
+                if self.current >= 0:
+                    changed.add(self.current)
+            elif kind == "path":
+                for i in item[1]:
+                    if cells[i] not in (START, GOAL):
+                        cells[i] = PATH
+                        changed.add(i)
+
+    # -------------------------------------------------------------------------
+    # ENCODING
+    # -------------------------------------------------------------------------
+
+    def _snapshot(self):
+        caption = self.caption.encode("utf-8")
+        header = SNAPSHOT_HEADER.pack(MSG_SNAPSHOT, self.width, self.height, len(caption))
+        return header + caption + bytes(self.cells) + self._delta([])
+
+    def _delta(self, indices):
+        indices = array("I", sorted(indices))
+        codes = bytes(self.cells[i] for i in indices)
+        if sys.byteorder == "big":
+            indices.byteswap()
+        header = DELTA_HEADER.pack(MSG_DELTA, self.iterations, self.visited_nodes,
+                                   self.current, len(indices))
+        return header + indices.tobytes() + codes
+
+    # -------------------------------------------------------------------------
+    # CONNECTIONS
+    # -------------------------------------------------------------------------
+
+    def _http(self, connection, request):
+        if request.path == "/ws":
+            return None
+        response = connection.respond(HTTPStatus.OK, INDEX_HTML)
+        del response.headers["Content-Type"]
+        response.headers["Content-Type"] = "text/html; charset=utf-8"
+        return response
+
+    async def _handler(self, websocket):
+        client = _Client()
+        client.wake.set()
+        self.clients.add(client)
+        sender = asyncio.create_task(self._send_loop(websocket, client))
+        try:
+            await websocket.wait_closed()
+        finally:
+            self.clients.discard(client)
+            sender.cancel()
+
+    async def _send_loop(self, websocket, client):
+        while True:
+            await client.wake.wait()
+            client.wake.clear()
+            # Everything changed while the previous send was in flight is merged here
+            if client.snapshot or len(client.dirty) * 5 > len(self.cells):
+                message = self._snapshot()
+                client.snapshot = False
+            else:
+                message = self._delta(client.dirty)
+            client.dirty = set()
+            await websocket.send(message)
+
+
+INDEX_HTML = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Search Stream Viewer</title>
+<style>
+  body { background: #282828; color: #ddd; font-family: sans-serif; margin: 16px; }
+  canvas { image-rendering: pixelated; border: 1px solid #555; }
+  #info { margin: 8px 0; }
+</style>
+</head>
+<body>
+<h3 id="caption">Esperando búsqueda...</h3>
+<div id="info"></div>
+<canvas id="map"></canvas>
+<script>
+const COLORS = ["#e6e6e6", "#323232", "#0064ff", "#ffb000", "#b4dcff", "#78a8d8", "#64ff96"];
+const CURRENT = "#ffff64";
+const canvas = document.getElementById("map");
+const ctx = canvas.getContext("2d");
+let width = 0, height = 0, tile = 1, cells = new Uint8Array(0), current = -1;
+
+function drawCell(i) {
+  if (i < 0 || i >= cells.length) return;
+  ctx.fillStyle = i === current && cells[i] !== 2 ? CURRENT : COLORS[cells[i]];
+  ctx.fillRect((i % width) * tile, Math.floor(i / width) * tile, tile, tile);
+}
+
+function applyDelta(view, offset) {
+  const iterations = view.getUint32(offset + 1, true);
+  const visited = view.getUint32(offset + 5, true);
+  const previous = current;
+  current = view.getInt32(offset + 9, true);
+  const count = view.getUint32(offset + 13, true);
+  const indices = offset + 17, codes = indices + 4 * count;
+  for (let k = 0; k < count; k++) {
+    const i = view.getUint32(indices + 4 * k, true);
+    cells[i] = view.getUint8(codes + k);
+    drawCell(i);
+  }
+  drawCell(previous);
+  drawCell(current);
+  document.getElementById("info").textContent =
+    "Iteraciones: " + iterations + " | Nodos visitados: " + visited;
+}
+
+function onMessage(event) {
+  const view = new DataView(event.data);
+  if (view.getUint8(0) === 0) {
+    width = view.getUint16(1, true);
+    height = view.getUint16(3, true);
+    const captionLength = view.getUint16(5, true);
+    const caption = new TextDecoder().decode(new Uint8Array(event.data, 7, captionLength));
+    cells = new Uint8Array(event.data.slice(7 + captionLength, 7 + captionLength + width * height));
+    tile = Math.max(1, Math.floor(Math.min(1200 / width, 800 / height)));
+    canvas.width = width * tile;
+    canvas.height = height * tile;
+    document.getElementById("caption").textContent = caption;
+    for (let i = 0; i < cells.length; i++) drawCell(i);
+    applyDelta(view, 7 + captionLength + width * height);
+  } else {
+    applyDelta(view, 0);
+  }
+}
+
+function connect() {
+  const ws = new WebSocket("ws://" + location.host + "/ws");
+  ws.binaryType = "arraybuffer";
+  ws.onmessage = onMessage;
+  ws.onclose = () => setTimeout(connect, 1000);
+}
+connect();
+</script>
+</body>
+</html>
+"""